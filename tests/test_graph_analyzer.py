@@ -0,0 +1,52 @@
+import json
+import os
+
+from universal_parser.analyzing.graph_analyzer import GraphAnalyzer
+
+
+def write_aggregated_results(path, object_id="pkg.b.Bar"):
+    path.write_text(json.dumps({
+        "repository": {"path": str(path.parent)},
+        "nodes": [{"id": "pkg.a.Foo", "implementation_file": "pkg/a.py"}],
+        "edges": [{
+            "subject_id": "pkg.a.Foo",
+            "subject_implementation_file": "pkg/a.py",
+            "object_id": object_id,
+            "object_implementation_file": "pkg/b.py",
+            "type": "calls",
+        }],
+    }))
+
+
+def test_on_demand_modes_keep_separate_caches(tmp_path):
+    path = tmp_path / "aggregated_results.json"
+    write_aggregated_results(path)
+
+    # Build each mode once, then alternate so both are served from their caches
+    for _ in range(2):
+        on_demand = GraphAnalyzer(str(path), on_demand=True)
+        assert set(on_demand.get_all_node_ids()) == {"pkg.a.Foo", "pkg.b.Bar"}
+        default = GraphAnalyzer(str(path), on_demand=False)
+        assert set(default.get_all_node_ids()) == {"pkg.a.Foo"}
+
+    assert (tmp_path / "aggregated_results.graph.pkl").exists()
+    assert (tmp_path / "aggregated_results.graph.ondemand.pkl").exists()
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_cache_is_rebuilt_when_results_change(tmp_path):
+    path = tmp_path / "aggregated_results.json"
+    write_aggregated_results(path)
+    assert set(GraphAnalyzer(str(path), on_demand=True).get_all_node_ids()) == {"pkg.a.Foo", "pkg.b.Bar"}
+
+    # Same size, different content; the new mtime alone must invalidate the cache
+    write_aggregated_results(path, object_id="pkg.b.Baz")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert set(GraphAnalyzer(str(path), on_demand=True).get_all_node_ids()) == {"pkg.a.Foo", "pkg.b.Baz"}
+
+    # Different size, same mtime; the size alone must invalidate the cache
+    stat = path.stat()
+    write_aggregated_results(path, object_id="pkg.b.Quux")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert set(GraphAnalyzer(str(path), on_demand=True).get_all_node_ids()) == {"pkg.a.Foo", "pkg.b.Quux"}
@@ -0,0 +1,34 @@
+from universal_parser.core.models import Edge, Node
+from universal_parser.parsing.incremental import IncrementalAggregator
+
+
+def test_remove_file_data_matches_multi_dot_filenames(tmp_path):
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    aggregator = IncrementalAggregator(str(repo_dir), str(tmp_path / "out"))
+    nodes = [
+        Node(id="foo.test.check", implementation_file="foo.test.py"),
+        Node(id="bar.run", implementation_file="bar.py"),
+    ]
+    edges = [
+        Edge(
+            subject_id="foo.test.check",
+            subject_implementation_file="foo.test.py",
+            object_id="bar.run",
+            object_implementation_file="bar.py",
+            type="calls",
+        ),
+    ]
+    aggregated_data = {
+        "nodes": [node.model_dump() for node in nodes],
+        "edges": [edge.model_dump() for edge in edges],
+    }
+    # Validation stores the file in its normalized form
+    assert aggregated_data["edges"][0]["subject_implementation_file"] == "foo/test.py"
+
+    aggregated_data = aggregator.remove_file_data_from_aggregated(
+        aggregated_data, [aggregator.repo_dir / "foo.test.py"]
+    )
+
+    assert [node["id"] for node in aggregated_data["nodes"]] == ["bar.run"]
+    assert aggregated_data["edges"] == []
@@ -0,0 +1,21 @@
+from universal_parser.core import config
+from universal_parser.utils.llm import get_llm_cache_path
+
+
+def test_llm_cache_key_depends_on_endpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "LLM_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "LLM_MODEL", "some-model")
+
+    monkeypatch.setattr(config, "LLM_BASE_URL", "https://api.example.com/v1")
+    hosted = get_llm_cache_path("prompt")
+    monkeypatch.setattr(config, "LLM_BASE_URL", "http://localhost:8000/v1")
+    local = get_llm_cache_path("prompt")
+
+    assert hosted != local
+    assert local == get_llm_cache_path("prompt")
+
+
+def test_llm_cache_is_disabled_without_cache_dir(monkeypatch):
+    monkeypatch.setattr(config, "LLM_CACHE_DIR", "")
+
+    assert get_llm_cache_path("prompt") is None
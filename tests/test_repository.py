@@ -0,0 +1,59 @@
+import asyncio
+from pathlib import Path
+
+from universal_parser.core.models import Edge, Node
+from universal_parser.parsing.repository import RepositoryParser
+
+
+def make_parser(tmp_path, results, delays=None):
+    """Build a RepositoryParser whose per-file parse returns canned results."""
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    parser = RepositoryParser(str(repo_dir), str(tmp_path / "out"))
+
+    async def parse_single_file_wrapper_incremental(file_path):
+        await asyncio.sleep((delays or {}).get(file_path, 0))
+        nodes, edges = results[file_path]
+        return nodes, edges, str(file_path)
+
+    parser.parse_single_file_wrapper_incremental = parse_single_file_wrapper_incremental
+    return parser
+
+
+def make_edge(edge_type, implementation_file="pkg/a.py"):
+    return Edge(
+        subject_id="pkg.a.Foo",
+        subject_implementation_file=implementation_file,
+        object_id="pkg.b.Bar",
+        object_implementation_file="pkg/b.py",
+        type=edge_type,
+    )
+
+
+def test_edges_of_different_types_between_same_nodes_are_kept(tmp_path):
+    node = Node(id="pkg.a.Foo", implementation_file="pkg/a.py")
+    results = {
+        Path("pkg/a.py"): ([node], [make_edge("calls"), make_edge("instantiates")]),
+        Path("pkg/c.py"): ([node], [make_edge("calls", "pkg/c.py")]),
+    }
+    parser = make_parser(tmp_path, results)
+
+    asyncio.run(parser.parse_files_concurrent_incremental(list(results), max_concurrent=1))
+
+    assert list(parser.all_nodes) == ["pkg.a.Foo"]
+    assert [edge.type for edge in parser.all_edges.values()] == ["calls", "instantiates"]
+    assert parser.all_edges[("pkg.a.Foo", "pkg.b.Bar", "calls")].subject_implementation_file == "pkg/a.py"
+
+
+def test_duplicates_keep_the_earliest_file_regardless_of_completion_order(tmp_path):
+    results = {
+        Path("pkg/a.py"): ([Node(id="pkg.a.Foo", implementation_file="pkg/a.py", start_line=1)], [make_edge("calls")]),
+        Path("pkg/c.py"): ([Node(id="pkg.a.Foo", implementation_file="pkg/c.py", start_line=9)], [make_edge("calls", "pkg/c.py")]),
+    }
+    # The first file's result arrives last
+    parser = make_parser(tmp_path, results, delays={Path("pkg/a.py"): 0.05})
+
+    asyncio.run(parser.parse_files_concurrent_incremental(list(results), max_concurrent=2))
+
+    assert parser.all_nodes["pkg.a.Foo"].start_line == 1
+    assert parser.all_edges[("pkg.a.Foo", "pkg.b.Bar", "calls")].subject_implementation_file == "pkg/a.py"
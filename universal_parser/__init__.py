@@ -9,8 +9,24 @@ __version__ = "0.1.0"
 __author__ = "Your Name"
 __email__ = "your.email@example.com"
 
-from .parsing.repository import RepositoryParser, parse_repository_incremental_main
-from .core.models import Node, Edge
+# Re-exports are resolved on first access so that importing a submodule such
+# as universal_parser.cli does not pull in the parsing machinery
+_LAZY_EXPORTS = {
+    "RepositoryParser": ".parsing.repository",
+    "parse_repository_incremental_main": ".parsing.repository",
+    "Node": ".core.models",
+    "Edge": ".core.models",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        from importlib import import_module
+        value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "RepositoryParser",
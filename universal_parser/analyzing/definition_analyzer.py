@@ -6,8 +6,7 @@ including its code snippet, dependents (nodes that depend on it), and
 dependencies (nodes it depends on).
 """
 
-import os
-from typing import Dict, List, Set, Optional, Any, Tuple
+from typing import Dict, Iterator, List, Set, Optional, Any, Tuple
 from pathlib import Path
 
 from .graph_analyzer import GraphAnalyzer
@@ -131,7 +130,7 @@ class DefinitionAnalyzer:
         
         if not nodes_in_file:
             # Try to find the file with different path formats
-            possible_paths = self._find_possible_file_paths(relative_file_path)
+            possible_paths = self.graph.find_possible_file_paths(relative_file_path)
             for possible_path in possible_paths:
                 nodes_in_file = self.graph.get_nodes_in_file(possible_path)
                 if nodes_in_file:
@@ -150,35 +149,13 @@ class DefinitionAnalyzer:
         
         return None
     
-    def _find_possible_file_paths(self, file_path: str) -> List[str]:
-        """Find possible file paths that might match the given path."""
-        available_files = self.graph.get_files_list()
-        possible_paths = []
-        
-        # Normalize the search path
-        search_path = file_path.lstrip('/')
-        search_name = os.path.basename(search_path)
-        
-        for available_file in available_files:
-            # Exact match
-            if available_file == search_path:
-                possible_paths.append(available_file)
-            # Filename match
-            elif os.path.basename(available_file) == search_name:
-                possible_paths.append(available_file)
-            # Suffix match
-            elif available_file.endswith(search_path):
-                possible_paths.append(available_file)
-        
-        return possible_paths
-    
     def _get_available_nodes_in_file(self, relative_file_path: str) -> List[str]:
         """Get list of available node names in a file."""
         nodes_in_file = self.graph.get_nodes_in_file(relative_file_path)
         
         if not nodes_in_file:
             # Try possible paths
-            possible_paths = self._find_possible_file_paths(relative_file_path)
+            possible_paths = self.graph.find_possible_file_paths(relative_file_path)
             for possible_path in possible_paths:
                 nodes_in_file = self.graph.get_nodes_in_file(possible_path)
                 if nodes_in_file:
@@ -196,46 +173,50 @@ class DefinitionAnalyzer:
         Returns:
             Formatted string representation
         """
-
-        lines = []
+        return '\n'.join(self.iter_definition_analysis_lines(analysis))
+    
+    def iter_definition_analysis_lines(self, analysis: DefinitionAnalysis) -> Iterator[str]:
+        """
+        Yield the lines of the formatted definition analysis one at a time.
         
+        Args:
+            analysis: The definition analysis result
+            
+        Returns:
+            Iterator over the lines of the formatted analysis, without newlines
+        """
         # Node information
-        # lines.append("## Node Metadata:")
-        # lines.append(analysis.node.__repr__(include_absolute_path=True))
-        # lines.append("")
+        # yield "## Node Metadata:"
+        # yield analysis.node.__repr__(include_absolute_path=True)
+        # yield ""
         
         # Code snippet
-        lines.append(f"# Implementation of `{analysis.node.file_level_id}`:")
-        # lines.append("```")
+        yield f"# Implementation of `{analysis.node.file_level_id}`:"
+        # yield "```"
         code_lines = analysis.node.code_snippet.strip().split('\n')
         for line_idx, line in enumerate(code_lines):
             line_number = analysis.node.start_line + line_idx + 1
-            lines.append(f"{line_number:6}\t{line}")
-        # lines.append("```")
-        lines.append("")
-
-        metadata_lines = []
+            yield f"{line_number:6}\t{line}"
+        # yield "```"
+        yield ""
+        
+        if analysis.dependencies or analysis.dependents:
+            yield "# Extra dependencies information:"
         
         # Dependencies (nodes this node depends on)
         if analysis.dependencies:
-            metadata_lines.append(f"## This component ({analysis.node.file_level_id}) depends on:")
+            yield f"## This component ({analysis.node.file_level_id}) depends on:"
             for dependency_node, edge_types in analysis.dependencies:
                 edge_types_str = ", ".join(edge_types) if edge_types else "unknown"
-                metadata_lines.append(f"  {dependency_node.__repr__(include_absolute_path=True)} [dependency type: {edge_types_str}]")
-            metadata_lines.append("")
+                yield f"  {dependency_node.__repr__(include_absolute_path=True)} [dependency type: {edge_types_str}]"
+            yield ""
         
         # Dependents (nodes that depend on this node)
         if analysis.dependents:
-            metadata_lines.append(f"## Components depend on this component ({analysis.node.file_level_id}):")
+            yield f"## Components depend on this component ({analysis.node.file_level_id}):"
             for dependent_node, edge_types in analysis.dependents:
                 edge_types_str = ", ".join(edge_types) if edge_types else "unknown"
-                metadata_lines.append(f"  {dependent_node.__repr__(include_absolute_path=True)} [dependent type: {edge_types_str}]")
-        
-        if metadata_lines:
-            lines.append("# Extra dependencies information:")
-            lines.extend(metadata_lines)
-        
-        return '\n'.join(lines)
+                yield f"  {dependent_node.__repr__(include_absolute_path=True)} [dependent type: {edge_types_str}]"
     
     @classmethod
     def from_aggregated_results(cls, aggregated_results_path: str, on_demand: bool = False) -> "DefinitionAnalyzer":
@@ -5,9 +5,8 @@ This module provides functionality to generate file summaries showing only
 the first line of each node with elide messages for the remaining content.
 """
 
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from pathlib import Path
-import os
 
 from .graph_analyzer import GraphAnalyzer
 from ..core.models import Node
@@ -61,8 +60,9 @@ class FileSummaryAnalyzer:
         Raises:
             ValueError: If the file is not found in the graph
         """
-        # Normalize the file path
-        normalized_path = self._normalize_file_path(file_path)
+        # Normalize the file path, making absolute paths relative to the repository
+        # so they hit the per-file node index instead of the path search below
+        normalized_path = self._normalize_file_path(file_path, self.graph.absolute_path_to_repo)
         
         logger.debug(f"Analyzing file summary for: {normalized_path}")
         
@@ -71,7 +71,7 @@ class FileSummaryAnalyzer:
         
         if not nodes_in_file:
             # Try to find the file with different path formats
-            possible_paths = self._find_possible_file_paths(file_path)
+            possible_paths = self.graph.find_possible_file_paths(file_path)
             for possible_path in possible_paths:
                 nodes_in_file = self.graph.get_nodes_in_file(possible_path)
                 if nodes_in_file:
@@ -111,28 +111,6 @@ class FileSummaryAnalyzer:
         
         return normalized
     
-    def _find_possible_file_paths(self, file_path: str) -> List[str]:
-        """Find possible file paths that might match the given path."""
-        available_files = self.graph.get_files_list()
-        possible_paths = []
-        
-        # Normalize the search path
-        search_path = file_path.lstrip('/')
-        search_name = os.path.basename(search_path)
-        
-        for available_file in available_files:
-            # Exact match
-            if available_file == search_path:
-                possible_paths.append(available_file)
-            # Filename match
-            elif os.path.basename(available_file) == search_name:
-                possible_paths.append(available_file)
-            # Suffix match
-            elif available_file.endswith(search_path):
-                possible_paths.append(available_file)
-        
-        return possible_paths
-    
     def format_file_summary(
         self, 
         summary: FileSummary,
@@ -148,36 +126,47 @@ class FileSummaryAnalyzer:
         Returns:
             Formatted string representation
         """
-        lines = []
+        return '\n'.join(self.iter_file_summary_lines(summary, k=k))
+    
+    def iter_file_summary_lines(
+        self, 
+        summary: FileSummary,
+        k: int = 5
+    ) -> Iterator[str]:
+        """
+        Yield the lines of the formatted file summary one at a time.
         
+        Args:
+            summary: The file summary result
+            k: Number of first lines to show
+            
+        Returns:
+            Iterator over the lines of the formatted summary, without newlines
+        """
         if not summary.nodes:
-            lines.append("No nodes found in this file.")
-            return '\n'.join(lines)
+            yield "No nodes found in this file."
+            return
         
         # Sort nodes by start line (should already be sorted from graph_analyzer)
         sorted_nodes = sorted(summary.nodes, key=lambda n: n.start_line)
         
         current_line = 1
         
-        for i, node in enumerate(sorted_nodes):
+        for node in sorted_nodes:
+            
+            yield node.__repr__(include_absolute_path=False)
             
             # Show the node's first lines with line numbers
-            k_first_lines = node.get_k_first_line(k=k)
-            numbered_lines = []
-            for line_idx, line in enumerate(k_first_lines):
+            for line_idx, line in enumerate(node.get_k_first_line(k=k)):
                 line_number = node.start_line + line_idx + 1
-                numbered_lines.append(f"{line_number:6}\t{line}")
-            k_first_line = "\n".join(numbered_lines)
-            
-            lines.append(node.__repr__(include_absolute_path=False))
-            lines.append(f"{k_first_line}")
+                yield f"{line_number:6}\t{line}"
             
             # Show elide message for remaining lines in this node (if any)
             if node.end_line > node.start_line + k:
                 elided_in_node = node.end_line - node.start_line - k
-                lines.append(f"\t... eliding {elided_in_node} more lines ...")
+                yield f"\t... eliding {elided_in_node} more lines ..."
             
-            lines.append("")  # Empty line between nodes
+            yield ""  # Empty line between nodes
             
             # Update current line position
             current_line = node.end_line + 1
@@ -186,11 +175,9 @@ class FileSummaryAnalyzer:
         if summary.total_lines and current_line <= summary.total_lines:
             elided_at_end = summary.total_lines - current_line + 1
             if elided_at_end > 0:
-                lines.append(f"... eliding lines {current_line}–{summary.total_lines} ...")
-        
-        return '\n'.join(lines)
+                yield f"... eliding lines {current_line}–{summary.total_lines} ..."
     
-    def get_available_files(self) -> List[str]:
+    def get_available_files(self) -> Tuple[str, ...]:
         """Get list of all files available for analysis."""
         return self.graph.get_files_list()
     
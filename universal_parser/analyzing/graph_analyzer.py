@@ -7,88 +7,211 @@ aggregated results from the universal parser.
 
 import os
 import json
+import pickle
+from sys import intern
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, List, Set, Optional, Any
+from typing import Dict, FrozenSet, List, Set, Optional, Any, Tuple
 from collections import defaultdict
 
 from ..utils.logger import logger
-from ..core.models import Node, Edge
+from ..utils.json_io import atomic_write, load_json
+from ..core.models import Node, Edge, normalize_node_id, normalize_implementation_file
+
+# Bump whenever the layout of the pickled graph cache changes
+GRAPH_CACHE_VERSION = 4
 
 
 class GraphAnalyzer:
     """Main analyzer for processing code graphs from aggregated results."""
     
-    def __init__(self, aggregated_results_path: str, on_demand: bool = False):
+    def __init__(self, aggregated_results_path: str, on_demand: bool = False, use_cache: bool = True):
         """
         Initialize the graph analyzer.
         
         Args:
             aggregated_results_path: Path to the aggregated results JSON file
+            on_demand: Whether to add nodes referenced only by edges to the graph
+            use_cache: Whether to reuse/write the pickled graph cache next to the JSON file.
+                Loading it unpickles whatever is there, so the directory must be trusted
         """
         self.aggregated_results_path = Path(aggregated_results_path)
+        # on_demand changes the built graph, so each mode keeps its own cache file
+        cache_suffix = ".graph.ondemand.pkl" if on_demand else ".graph.pkl"
+        self.cache_path = self.aggregated_results_path.with_suffix(cache_suffix)
         self.data: Optional[Dict[str, Any]] = None
-        self.nodes: Dict[str, Node] = {}
-        self.edges: List[Edge] = []
-        self.adjacency_list: Dict[str, Set[str]] = defaultdict(set)
-        self.reverse_adjacency_list: Dict[str, Set[str]] = defaultdict(set)
-        self.files_to_nodes: Dict[str, List[Node]] = defaultdict(list)
+        self.repository_info: Dict[str, Any] = {}
+        self.statistics: Dict[str, Any] = {}
+        
+        # Raw node/edge records, indexed once; Node and Edge objects are only
+        # built for the records a query actually touches
+        self.node_records: Dict[str, Dict[str, Any]] = {}
+        self.file_node_records: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.edge_records: List[Dict[str, Any]] = []
+        self.materialized_nodes: Dict[str, Node] = {}
+        self.materialized_files: Dict[str, List[Node]] = {}
         
-        self._load_data()
-        self._build_graph(on_demand)
+        if not (use_cache and self._load_cache(on_demand)):
+            self._load_data()
+            self._build_graph(on_demand)
+            if use_cache:
+                self._save_cache(on_demand)
     
     def _load_data(self):
         """Load the aggregated results from JSON file."""
         try:
-            with open(self.aggregated_results_path, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
+            self.data = load_json(self.aggregated_results_path)
             logger.debug(f"Loaded aggregated results from {self.aggregated_results_path}")
         except FileNotFoundError:
             raise FileNotFoundError(f"Aggregated results file not found: {self.aggregated_results_path}")
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON in aggregated results file: {e}")
     
+    def _cache_key(self, on_demand: bool) -> tuple:
+        """Identify the aggregated results file contents the cache was built from."""
+        stat = self.aggregated_results_path.stat()
+        return (GRAPH_CACHE_VERSION, on_demand, stat.st_mtime_ns, stat.st_size)
+    
+    def _load_cache(self, on_demand: bool) -> bool:
+        """Load the graph from the pickled cache if it matches the JSON file."""
+        try:
+            key = self._cache_key(on_demand)
+            with open(self.cache_path, 'rb') as f:
+                if pickle.load(f) != key:
+                    return False
+                cached = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable graph cache {self.cache_path}: {e}")
+            return False
+        
+        self.repository_info = cached["repository_info"]
+        self.statistics = cached["statistics"]
+        self.node_records = cached["node_records"]
+        self.file_node_records = cached["file_node_records"]
+        self.edge_records = cached["edge_records"]
+        logger.debug(f"Loaded graph from cache {self.cache_path}")
+        return True
+    
+    def _save_cache(self, on_demand: bool) -> None:
+        """Atomically write the built graph to the pickled cache next to the JSON file."""
+        cached = {
+            "repository_info": self.repository_info,
+            "statistics": self.statistics,
+            "node_records": self.node_records,
+            "file_node_records": self.file_node_records,
+            "edge_records": self.edge_records
+        }
+        try:
+            with atomic_write(self.cache_path) as f:
+                pickle.dump(self._cache_key(on_demand), f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            logger.debug(f"Could not write graph cache {self.cache_path}: {e}")
+    
     def _build_graph(self, on_demand: bool = False):
         """Build the graph structure from loaded data."""
         if not self.data:
             raise ValueError("No data loaded")
         
-        absolute_path_to_repo = self.data.get("repository", {}).get("path", "")
+        self.repository_info = self.data.get("repository", {})
+        self.statistics = self.data.get("statistics", {})
         
-        # Build nodes
+        # Index node records under the ID and file that Node validation would give them
         for node_data in self.data.get("nodes", []):
-            node = Node.from_dict(node_data, absolute_path_to_repo)
-            self.nodes[node.id] = node
-            self.files_to_nodes[node.implementation_file].append(node)
+            node_id = intern(normalize_node_id(node_data["id"]))
+            implementation_file = intern(normalize_implementation_file(node_data["implementation_file"]))
+            self.node_records[node_id] = node_data
+            self.file_node_records[implementation_file].append(node_data)
         
-        # Build edges and adjacency lists
-        for edge_data in self.data.get("edges", []):
-            edge = Edge.from_dict(edge_data)
-            self.edges.append(edge)
-
-            # if on_demand, add nodes if they are not in the graph
-            if on_demand:
-                if edge.subject_id not in self.nodes:
-                    self.nodes[edge.subject_id] = Node.from_dict({"id": edge.subject_id, "implementation_file": edge.subject_implementation_file}, absolute_path_to_repo)
-                if edge.object_id not in self.nodes:
-                    self.nodes[edge.object_id] = Node.from_dict({"id": edge.object_id, "implementation_file": edge.object_implementation_file}, absolute_path_to_repo)
-            
-            # Build adjacency lists for graph traversal
-            self.adjacency_list[edge.subject_id].add(edge.object_id)
-            self.reverse_adjacency_list[edge.object_id].add(edge.subject_id)
+        # Normalize edge endpoints the same way, so adjacency keys match node IDs
+        self.edge_records = self.data.get("edges", [])
+        for edge_data in self.edge_records:
+            edge_data["subject_id"] = intern(normalize_node_id(edge_data["subject_id"]))
+            edge_data["object_id"] = intern(normalize_node_id(edge_data["object_id"]))
         
-        # Sort nodes by line number within each file
-        for file_path in self.files_to_nodes:
-            self.files_to_nodes[file_path].sort(key=lambda n: n.start_line)
+        # if on_demand, add nodes if they are not in the graph
+        if on_demand:
+            for edge_data in self.edge_records:
+                if edge_data["subject_id"] not in self.node_records:
+                    self.node_records[edge_data["subject_id"]] = {"id": edge_data["subject_id"], "implementation_file": edge_data["subject_implementation_file"]}
+                if edge_data["object_id"] not in self.node_records:
+                    self.node_records[edge_data["object_id"]] = {"id": edge_data["object_id"], "implementation_file": edge_data["object_implementation_file"]}
         
-        logger.debug(f"Built graph with {len(self.nodes)} nodes and {len(self.edges)} edges")
+        # The raw JSON tree is no longer needed once the graph is built
+        self.data = None
+        
+        logger.debug(f"Built graph with {len(self.node_records)} nodes and {len(self.edge_records)} edges")
+    
+    @property
+    def absolute_path_to_repo(self) -> str:
+        """Repository root that node implementation files are relative to."""
+        return self.repository_info.get("path", "")
+    
+    @cached_property
+    def nodes(self) -> Dict[str, Node]:
+        """All nodes in the graph by ID, materializing every node record."""
+        return {node_id: self.get_node(node_id) for node_id in self.node_records}
+    
+    @cached_property
+    def edges(self) -> List[Edge]:
+        """All edges in the graph, materializing every edge record."""
+        return [Edge.from_dict(edge_data) for edge_data in self.edge_records]
+    
+    @cached_property
+    def files_to_nodes(self) -> Dict[str, List[Node]]:
+        """All files and their nodes sorted by line number, materializing every node record."""
+        return {file_path: self.get_nodes_in_file(file_path) for file_path in self.file_node_records}
+    
+    # Edge indexes are only needed for traversal, so they are built on first use
+    
+    @cached_property
+    def adjacency_list(self) -> Dict[str, Set[str]]:
+        """Map each node to the nodes it points to."""
+        adjacency_list: Dict[str, Set[str]] = defaultdict(set)
+        for edge_data in self.edge_records:
+            adjacency_list[intern(edge_data["subject_id"])].add(intern(edge_data["object_id"]))
+        return adjacency_list
+    
+    @cached_property
+    def reverse_adjacency_list(self) -> Dict[str, Set[str]]:
+        """Map each node to the nodes that point to it."""
+        reverse_adjacency_list: Dict[str, Set[str]] = defaultdict(set)
+        for edge_data in self.edge_records:
+            reverse_adjacency_list[intern(edge_data["object_id"])].add(intern(edge_data["subject_id"]))
+        return reverse_adjacency_list
+    
+    @cached_property
+    def edges_by_endpoints(self) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Map each (subject_id, object_id) pair to the records of the edges between them."""
+        edges_by_endpoints: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for edge_data in self.edge_records:
+            edges_by_endpoints[(edge_data["subject_id"], edge_data["object_id"])].append(edge_data)
+        return edges_by_endpoints
     
     def get_node(self, node_id: str) -> Optional[Node]:
         """Get a node by its ID."""
-        return self.nodes.get(node_id)
+        node = self.materialized_nodes.get(node_id)
+        if node is None:
+            node_data = self.node_records.get(node_id)
+            if node_data is None:
+                return None
+            node = Node.from_dict(node_data, self.absolute_path_to_repo)
+            self.materialized_nodes[node_id] = node
+        return node
     
     def get_nodes_in_file(self, file_path: str) -> List[Node]:
         """Get all nodes in a specific file, sorted by line number."""
-        return self.files_to_nodes.get(file_path, [])
+        nodes = self.materialized_files.get(file_path)
+        if nodes is None:
+            node_records = self.file_node_records.get(file_path)
+            if not node_records:
+                return []
+            nodes = [Node.from_dict(node_data, self.absolute_path_to_repo) for node_data in node_records]
+            nodes.sort(key=lambda n: n.start_line)
+            self.materialized_files[file_path] = nodes
+        return nodes
     
     def get_outgoing_nodes(self, node_id: str) -> Set[str]:
         """Get all nodes that this node points to."""
@@ -100,29 +223,67 @@ class GraphAnalyzer:
     
     def get_all_neighbors(self, node_id: str) -> Set[str]:
         """Get all connected nodes (both incoming and outgoing)."""
-        return self.get_outgoing_nodes(node_id) | self.get_incoming_nodes(node_id)
+        outgoing = self.adjacency_list.get(node_id, ())
+        incoming = self.reverse_adjacency_list.get(node_id, ())
+        # Copy the larger side and merge the smaller one into it
+        if len(outgoing) < len(incoming):
+            outgoing, incoming = incoming, outgoing
+        neighbors = set(outgoing)
+        neighbors.update(incoming)
+        return neighbors
     
     def find_edges_between(self, subject_id: str, object_id: str) -> List[Edge]:
         """Find all edges between two specific nodes."""
-        return [edge for edge in self.edges 
-                if edge.subject_id == subject_id and edge.object_id == object_id]
+        return [Edge.from_dict(edge_data) for edge_data in self.edges_by_endpoints.get((subject_id, object_id), ())]
     
     def get_repository_info(self) -> Dict[str, Any]:
         """Get repository information from the aggregated results."""
-        return self.data.get("repository", {}) if self.data else {}
+        return self.repository_info
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get parsing statistics from the aggregated results."""
-        return self.data.get("statistics", {}) if self.data else {}
+        return self.statistics
     
     def validate_node_exists(self, node_id: str) -> bool:
         """Check if a node exists in the graph."""
-        return node_id in self.nodes
+        return node_id in self.node_records
     
-    def get_all_node_ids(self) -> Set[str]:
+    @cached_property
+    def all_node_ids(self) -> FrozenSet[str]:
+        """All node IDs in the graph, computed once."""
+        return frozenset(self.node_records)
+    
+    @cached_property
+    def files_list(self) -> Tuple[str, ...]:
+        """All files that contain nodes, computed once."""
+        return tuple(self.file_node_records)
+    
+    def get_all_node_ids(self) -> FrozenSet[str]:
         """Get all node IDs in the graph."""
-        return set(self.nodes.keys())
+        return self.all_node_ids
     
-    def get_files_list(self) -> List[str]:
+    def get_files_list(self) -> Tuple[str, ...]:
         """Get list of all files that contain nodes."""
-        return list(self.files_to_nodes.keys()) 
\ No newline at end of file
+        return self.files_list 
+    
+    def find_possible_file_paths(self, file_path: str) -> List[str]:
+        """Find possible file paths that might match the given path."""
+        available_files = self.get_files_list()
+        possible_paths = []
+        
+        # Normalize the search path
+        search_path = file_path.lstrip('/')
+        search_name = os.path.basename(search_path)
+        
+        for available_file in available_files:
+            # Exact match
+            if available_file == search_path:
+                possible_paths.append(available_file)
+            # Filename match
+            elif os.path.basename(available_file) == search_name:
+                possible_paths.append(available_file)
+            # Suffix match
+            elif available_file.endswith(search_path):
+                possible_paths.append(available_file)
+        
+        return possible_paths
@@ -5,33 +5,134 @@ This module provides the main CLI entry point for parsing repositories.
 """
 
 import argparse
-import asyncio
+import os
+import stat
 import sys
-from pathlib import Path
 import traceback
 import logging
+from typing import Iterable, List, Optional
 
-from .parsing.repository import parse_repository_incremental_main
 from .utils.logger import logger, set_log_level
-from .analyzing import FileSummaryAnalyzer, DefinitionAnalyzer
 
 
-def validate_repo_dir(repo_dir: str) -> Path:
-    """Validate that the repository path exists and is a directory."""
-    path = Path(repo_dir).resolve()
-    if not path.exists():
-        logger.debug(f"Repository path does not exist: {path}")
+def validate_repo_dir(repo_dir: str) -> str:
+    """Validate that the repository path exists and is a directory, returning it absolute."""
+    path = os.path.abspath(repo_dir)
+    try:
+        mode = os.stat(path).st_mode
+    except OSError:
+        logger.debug("Repository path does not exist: %s", path)
         sys.exit(1)
     
-    if not path.is_dir():
-        logger.debug(f"Repository path is not a directory: {path}")
+    if not stat.S_ISDIR(mode):
+        logger.debug("Repository path is not a directory: %s", path)
         sys.exit(1)
     
     return path
 
 
-def create_parser() -> argparse.ArgumentParser:
-    """Create and configure the argument parser."""
+# Arguments shared by every subcommand, as (flag, add_argument keyword arguments)
+COMMON_ARGUMENTS = [
+    ("--repo-dir", {
+        "required": True,
+        "type": str,
+        "help": "The absolute directory to the repository to parse"
+    }),
+    ("--output-dir", {
+        "required": True,
+        "type": str,
+        "help": "The absolute path to the output directory"
+    }),
+]
+
+# Argument specs by command name, in the order they are listed in --help
+COMMAND_SPECS = {
+    'parse': {
+        "help": "Parse entire repository from scratch",
+        "description": "Parse the entire repository, processing all supported files",
+        "arguments": COMMON_ARGUMENTS + [
+            ("--file-paths", {
+                "type": str,
+                "nargs": "+",
+                "required": False,
+                "default": [],
+                "help": "The absolute paths to the files to parse"
+            }),
+            ("--max-concurrent", {
+                "type": int,
+                "default": 5,
+                "help": "Maximum number of files to process concurrently (default: 5)"
+            }),
+        ],
+    },
+    'file-summary': {
+        "help": "Generate file summary with elide messages",
+        "description": "Generate a summary of a file showing only first lines of nodes with elide messages",
+        "arguments": COMMON_ARGUMENTS + [
+            ("--file-path", {
+                "required": True,
+                "type": str,
+                "help": "Path to the file to summarize (relative to repo or absolute)"
+            }),
+        ],
+    },
+    'get-definition': {
+        "help": "Get detailed definition analysis for a specific node",
+        "description": "Analyze a specific node by file path and name, showing code snippet, dependencies, and dependents",
+        "arguments": COMMON_ARGUMENTS + [
+            ("--file-path", {
+                "required": True,
+                "type": str,
+                "help": "Absolute path to the file containing the node"
+            }),
+            ("--node-name", {
+                "required": True,
+                "type": str,
+                "help": "Name of the node (e.g., 'SearchProvider', 'ClassName.method_name')"
+            }),
+        ],
+    },
+}
+
+# First arguments that are passed through as-is; anything else is legacy usage
+KNOWN_SUBCOMMANDS = frozenset({'parse', 'update', 'file-summary', 'get-definition', '-h', '--help'})
+
+
+def add_subparser(
+    subparsers: argparse._SubParsersAction,
+    command: str,
+    with_arguments: bool = True
+) -> None:
+    """
+    Add the subparser for a command from its argument spec.
+    
+    Args:
+        subparsers: The subparsers action to add the command to
+        command: Name of the command in COMMAND_SPECS
+        with_arguments: Whether to register the command's arguments; the
+            top-level help only needs the command name and summary
+    """
+    spec = COMMAND_SPECS[command]
+    subparser = subparsers.add_parser(
+        command,
+        help=spec["help"],
+        description=spec["description"]
+    )
+    if with_arguments:
+        for flag, kwargs in spec["arguments"]:
+            subparser.add_argument(flag, **kwargs)
+
+
+def create_parser(command: Optional[str] = None) -> argparse.ArgumentParser:
+    """
+    Create and configure the argument parser.
+    
+    Args:
+        command: The subcommand being run. Only its subparser is built in
+            full; when it is None or not a known command (e.g. top-level -h),
+            every command is registered with just its summary, so that help
+            and error messages still list them all.
+    """
     parser = argparse.ArgumentParser(
         description="Parse repositories to extract code structure and relationships",
         formatter_class=argparse.RawDescriptionHelpFormatter
@@ -39,113 +140,107 @@ def create_parser() -> argparse.ArgumentParser:
     
     # Create subparsers for different commands
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
-
-    # Full parse subcommand
-    parse_parser = subparsers.add_parser(
-        'parse', 
-        help='Parse entire repository from scratch',
-        description='Parse the entire repository, processing all supported files'
-    )
     
-    # Required arguments
-    parse_parser.add_argument(
-        "--repo-dir", 
-        required=True, 
-        type=str,
-        help="The absolute directory to the repository to parse"
-    )
+    if command in COMMAND_SPECS:
+        add_subparser(subparsers, command)
+    else:
+        for name in COMMAND_SPECS:
+            add_subparser(subparsers, name, with_arguments=False)
+    
+    # Legacy support: if no subcommand is provided, default to parse
+    parser.set_defaults(command='parse')
+    
+    return parser
 
-    parse_parser.add_argument(
-        "--output-dir", 
-        type=str, 
-        required=True,
-        help="The absolute path to the output directory"
-    )
 
-    parse_parser.add_argument(
-        "--file-paths",
-        type=str,
-        required=False,
-        default=[],
-        help="The absolute paths to the files to parse"
-    )
+def parse_args_fast(argv: List[str]) -> Optional[argparse.Namespace]:
+    """
+    Parse command-line arguments straight from COMMAND_SPECS, without argparse.
     
-    parse_parser.add_argument(
-        "--max-concurrent", 
-        type=int, 
-        default=5,
-        help="Maximum number of files to process concurrently (default: 5)"
-    )
+    Only the plain `<command> --flag value ...` form is handled, with several
+    values allowed for nargs="+" arguments. Anything else (help, unknown,
+    repeated or abbreviated flags, --flag=value, missing values or required
+    arguments) returns None, so that argparse can parse it and produce its
+    usual help and error messages.
     
+    Args:
+        argv: Command-line arguments, excluding the program name
+        
+    Returns:
+        The parsed arguments, or None if argparse should handle them
+    """
+    if not argv or argv[0] not in COMMAND_SPECS:
+        return None
     
-    # File summary subcommand
-    file_summary_parser = subparsers.add_parser(
-        'file-summary',
-        help='Generate file summary with elide messages',
-        description='Generate a summary of a file showing only first lines of nodes with elide messages'
-    )
-    file_summary_parser.add_argument(
-        "--repo-dir",
-        required=True,
-        type=str,
-        help="The absolute directory to the repository to parse"
-    )
-    file_summary_parser.add_argument(
-        "--output-dir",
-        type=str, 
-        required=True,
-        help="The absolute path to the output directory"
-    )
-    file_summary_parser.add_argument(
-        "--file-path",
-        required=True,
-        type=str,
-        help="Path to the file to summarize (relative to repo or absolute)"
-    )
+    arguments = dict(COMMAND_SPECS[argv[0]]["arguments"])
+    tokens_by_flag = {}
+    flag = None
+    for token in argv[1:]:
+        if token.startswith('-'):
+            if token not in arguments or token in tokens_by_flag or (flag and not tokens_by_flag[flag]):
+                return None
+            flag = token
+            tokens_by_flag[flag] = []
+        elif flag is None or (tokens_by_flag[flag] and arguments[flag].get("nargs") != "+"):
+            return None
+        else:
+            tokens_by_flag[flag].append(token)
+    if flag and not tokens_by_flag[flag]:
+        return None
     
-    # Get definition subcommand
-    get_definition_parser = subparsers.add_parser(
-        'get-definition',
-        help='Get detailed definition analysis for a specific node',
-        description='Analyze a specific node by file path and name, showing code snippet, dependencies, and dependents'
-    )
-    get_definition_parser.add_argument(
-        "--repo-dir",
-        required=True,
-        type=str,
-        help="The absolute directory to the repository to parse"
-    )
-    get_definition_parser.add_argument(
-        "--output-dir",
-        type=str, 
-        required=True,
-        help="The absolute path to the output directory"
-    )
-    get_definition_parser.add_argument(
-        "--file-path",
-        required=True,
-        type=str,
-        help="Absolute path to the file containing the node"
-    )
-    get_definition_parser.add_argument(
-        "--node-name",
-        required=True,
-        type=str,
-        help="Name of the node (e.g., 'SearchProvider', 'ClassName.method_name')"
-    )
+    values = {}
+    for flag, tokens in tokens_by_flag.items():
+        spec = arguments[flag]
+        convert = spec.get("type", str)
+        try:
+            converted = [convert(token) for token in tokens]
+        except ValueError:
+            return None
+        values[flag] = converted if spec.get("nargs") == "+" else converted[0]
     
-    # Legacy support: if no subcommand is provided, default to parse
-    parser.set_defaults(command='parse')
+    args = argparse.Namespace(command=argv[0])
+    for flag, spec in arguments.items():
+        if flag in values:
+            value = values[flag]
+        elif spec.get("required"):
+            return None
+        else:
+            value = spec.get("default")
+        setattr(args, flag.lstrip('-').replace('-', '_'), value)
     
-    return parser
+    return args
 
 
-async def run_file_summary(args: argparse.Namespace) -> None:
+def run_async(coroutine):
+    """Run a coroutine to completion, on uvloop's event loop when it is installed."""
+    import asyncio
+    
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
+    return asyncio.run(coroutine)
+
+
+def write_lines(lines: Iterable[str]) -> None:
+    """Write formatted output to stdout line by line, without joining it first."""
+    write = sys.stdout.write
+    for line in lines:
+        write(line)
+        write('\n')
+
+
+def run_file_summary(args: argparse.Namespace) -> None:
     """Run file summary analysis."""
+    from .analyzing import FileSummaryAnalyzer
+    
     try:
         args.file_paths = [args.file_path]
         args.max_concurrent = 1
-        aggregated_results_path = await run_parser(args)
+        aggregated_results_path = run_async(run_parser(args))
 
         # Create analyzer
         analyzer = FileSummaryAnalyzer.from_aggregated_results(aggregated_results_path)
@@ -154,23 +249,25 @@ async def run_file_summary(args: argparse.Namespace) -> None:
         summary = analyzer.analyze_file_summary(file_path=args.file_path)
         
         # Format result
-        print(analyzer.format_file_summary(summary))
+        write_lines(analyzer.iter_file_summary_lines(summary))
         
     except KeyboardInterrupt:
         logger.debug("🛑 Analysis interrupted by user")
         sys.exit(130)
     except Exception as e:
-        logger.debug(f"❌ File summary failed with error: {e}")
+        logger.debug("❌ File summary failed with error: %s", e)
         logger.error(traceback.format_exc())
         sys.exit(1)
 
 
-async def run_get_definition(args: argparse.Namespace) -> None:
+def run_get_definition(args: argparse.Namespace) -> None:
     """Run definition analysis."""
+    from .analyzing import DefinitionAnalyzer
+    
     try:
         args.file_paths = [args.file_path]
         args.max_concurrent = 1
-        aggregated_results_path = await run_parser(args)
+        aggregated_results_path = run_async(run_parser(args))
         
         # Create analyzer
         analyzer = DefinitionAnalyzer.from_aggregated_results(str(aggregated_results_path), on_demand=True)
@@ -182,33 +279,35 @@ async def run_get_definition(args: argparse.Namespace) -> None:
         )
         
         # Format and print result
-        print(analyzer.format_definition_analysis(analysis))
+        write_lines(analyzer.iter_definition_analysis_lines(analysis))
         
-        logger.debug(f"✅ Definition analysis completed successfully!")
+        logger.debug("✅ Definition analysis completed successfully!")
         
     except KeyboardInterrupt:
         logger.debug("🛑 Analysis interrupted by user")
         sys.exit(130)
     except Exception as e:
-        logger.debug(f"❌ Definition analysis failed with error: {e}")
+        logger.debug("❌ Definition analysis failed with error: %s", e)
         logger.error(traceback.format_exc())
         sys.exit(1)
 
 
 async def run_parser(args: argparse.Namespace) -> None:
     """Run the repository parser with the given arguments."""
+    from .parsing.repository import parse_repository_incremental_main
+    
     try:
         # Run incremental update
         output_file = await parse_repository_incremental_main(
-            repo_dir=str(args.repo_dir),
+            repo_dir=args.repo_dir,
             output_dir=args.output_dir,
             file_paths=args.file_paths,
             max_concurrent=args.max_concurrent
         )
         
         if output_file:
-            logger.debug(f"✅ Incremental repository update completed successfully!")
-            logger.debug(f"📁 Results saved to: {output_file}")
+            logger.debug("✅ Incremental repository update completed successfully!")
+            logger.debug("📁 Results saved to: %s", output_file)
         else:
             logger.warning("⚠️  Incremental update completed but no output file was generated")
         
@@ -218,35 +317,39 @@ async def run_parser(args: argparse.Namespace) -> None:
         logger.debug("🛑 Parser interrupted by user")
         sys.exit(130)
     except Exception as e:
-        logger.debug(f"❌ Parser failed with error: {e}")
+        logger.debug("❌ Parser failed with error: %s", e)
         logger.error(traceback.format_exc())
         sys.exit(1)
 
 
 def main() -> None:
     """Main entry point for the CLI."""
-    parser = create_parser()
-    
     # Handle legacy usage (no subcommand) by checking if first arg looks like --repo-dir
-    if len(sys.argv) > 1 and not sys.argv[1] in ['parse', 'update', 'file-summary', 'get-definition', '-h', '--help']:
+    # (slicing yields no command instead of raising IndexError when there are no arguments)
+    command = next(iter(sys.argv[1:2]), None)
+    if command is not None and command not in KNOWN_SUBCOMMANDS:
         # Legacy usage - insert 'parse' as the default command
         sys.argv.insert(1, 'parse')
+        command = 'parse'
     
-    args = parser.parse_args()
+    args = parse_args_fast(sys.argv[1:])
+    if args is None:
+        parser = create_parser(command)
+        args = parser.parse_args()
 
     # set_log_level(logging.DEBUG)
 
     if args.command == 'file-summary':
         try:
-            asyncio.run(run_file_summary(args))
+            run_file_summary(args)
         except Exception as e:
-            logger.debug(f"❌ Fatal error: {e}")
+            logger.debug("❌ Fatal error: %s", e)
             sys.exit(1)
     elif args.command == 'get-definition':
         try:
-            asyncio.run(run_get_definition(args))
+            run_get_definition(args)
         except Exception as e:
-            logger.debug(f"❌ Fatal error: {e}")
+            logger.debug("❌ Fatal error: %s", e)
             sys.exit(1)
     else:
         # Parse and update commands need repo validation and API key
@@ -254,17 +357,17 @@ def main() -> None:
         
         # Print startup info
         command_name = "Incremental Update" if args.command == 'update' else "Full Parse"
-        logger.debug(f"🚀 Starting Universal Parser - {command_name}")
-        logger.debug(f"📂 Repository: {args.repo_dir}")
-        logger.debug(f"🏷️  Output Directory: {args.output_dir}")
-        logger.debug(f"⚡ Concurrency: {args.max_concurrent}")
+        logger.debug("🚀 Starting Universal Parser - %s", command_name)
+        logger.debug("📂 Repository: %s", args.repo_dir)
+        logger.debug("🏷️  Output Directory: %s", args.output_dir)
+        logger.debug("⚡ Concurrency: %s", args.max_concurrent)
         
         # Run the parser
         try:
             set_log_level(logging.DEBUG)
-            asyncio.run(run_parser(args))
+            run_async(run_parser(args))
         except Exception as e:
-            logger.debug(f"❌ Fatal error: {e}")
+            logger.debug("❌ Fatal error: %s", e)
             sys.exit(1)
 
 
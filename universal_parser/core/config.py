@@ -1,17 +1,16 @@
 import os
-import json
-from pathlib import Path
-import argparse
-from typing import Dict, Any
 from dotenv import load_dotenv, find_dotenv
 
-# Load environment variables
-load_dotenv(find_dotenv())
+# Load environment variables; searching parent directories for a .env file
+# stats every level, so an explicitly configured file is loaded directly
+load_dotenv(os.environ.get("UNIVERSAL_PARSER_ENV_FILE") or find_dotenv())
 
 # Environment variables with defaults
 LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
 LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.openai.com/v1")
 LLM_API_KEY = os.getenv("LLM_API_KEY", "")
+# Directory of cached LLM responses; caching is off unless it is set
+LLM_CACHE_DIR = os.path.expanduser(os.getenv("LLM_CACHE_DIR", ""))
 
 def update_config(**kwargs) -> None:
     """Update configuration values."""
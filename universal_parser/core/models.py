@@ -1,7 +1,42 @@
 from pydantic import BaseModel, model_validator
 from typing import Optional, Dict, Any, Union
+from sys import intern
+from functools import lru_cache
 import os
 
+# Code snippets shorter than this are interned so repeated boilerplate is stored once
+INTERN_SNIPPET_MAX_LENGTH = 256
+
+
+def normalize_node_id(node_id: str) -> str:
+    """Normalize a node ID to its dotted form, as Node validation does."""
+    return node_id.replace("/", ".")
+
+
+@lru_cache(maxsize=4096)
+def normalize_implementation_file(implementation_file: str) -> str:
+    """Normalize an implementation file path, as Node validation does.
+    
+    Nodes and edges repeat the same few files, so results are cached per path.
+    """
+    extension_start = implementation_file.rfind(".")
+    head = implementation_file[:extension_start]
+    # Paths with at most one dot are already normalized; return them as-is so
+    # interned strings stay interned
+    if extension_start > 0 and "." in head:
+        return head.replace(".", "/") + implementation_file[extension_start:]
+    return implementation_file
+
+
+@lru_cache(maxsize=4096)
+def file_level_prefix(implementation_file: str) -> str:
+    """Get the dotted module prefix that is stripped from node IDs in a file.
+    
+    Many nodes share an implementation file, so the result is cached per file.
+    """
+    return implementation_file.split(".")[0].replace("/", ".")
+
+
 class Node(BaseModel):
     id: str
     implementation_file: str
@@ -12,31 +47,50 @@ class Node(BaseModel):
     absolute_path_to_implementation_file: str = ""
     file_level_id: str = ""
 
-    @model_validator(mode='after')
-    def validate_node(cls, data):
-        data.id = data.id.replace("/", ".")
-        parts = data.implementation_file.split(".")
-        if len(parts) > 1:
-            data.implementation_file = "/".join(parts[:-1]) + f".{parts[-1]}"
+    # Normalizing the raw input (rather than the built model) avoids pydantic's
+    # slow attribute assignment after validation
+    @model_validator(mode='before')
+    @classmethod
+    def validate_node(cls, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        
+        data = dict(data)
+        if isinstance(data.get("id"), str):
+            data["id"] = normalize_node_id(data["id"])
+        if isinstance(data.get("implementation_file"), str):
+            data["implementation_file"] = normalize_implementation_file(data["implementation_file"])
 
-        if isinstance(data.start_line, str):
-            data.start_line = int(data.start_line)
-        if isinstance(data.end_line, str):
-            data.end_line = int(data.end_line)
+        if isinstance(data.get("start_line"), str):
+            data["start_line"] = int(data["start_line"])
+        if isinstance(data.get("end_line"), str):
+            data["end_line"] = int(data["end_line"])
 
         return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any], absolute_path_to_repo: Optional[str] = None):
-        node = cls(**data)
+        # Derived fields are computed up front and passed in, so the node is built
+        # in a single validation pass with no attribute assignment afterwards
+        values = dict(data)
+        
+        # Ids and paths repeat across nodes and edges; share one copy of each
+        node_id = values["id"] = intern(normalize_node_id(data["id"]))
+        implementation_file = values["implementation_file"] = intern(normalize_implementation_file(data["implementation_file"]))
         if absolute_path_to_repo:
-            node.absolute_path_to_implementation_file = os.path.join(absolute_path_to_repo, node.implementation_file)
-        node.file_level_id = node.implementation_file.split(".")[0]
-        node.file_level_id = node.file_level_id.replace("/", ".")
-        node.file_level_id = node.id.replace(node.file_level_id, "")
-        if node.file_level_id.startswith("."):
-            node.file_level_id = node.file_level_id[1:]
-        return node
+            values["absolute_path_to_implementation_file"] = os.path.join(absolute_path_to_repo, implementation_file)
+        if "absolute_path_to_implementation_file" in values:
+            values["absolute_path_to_implementation_file"] = intern(values["absolute_path_to_implementation_file"])
+        code_snippet = values.get("code_snippet")
+        if isinstance(code_snippet, str) and len(code_snippet) < INTERN_SNIPPET_MAX_LENGTH:
+            values["code_snippet"] = intern(code_snippet)
+        
+        file_level_id = node_id.replace(file_level_prefix(implementation_file), "")
+        if file_level_id.startswith("."):
+            file_level_id = file_level_id[1:]
+        values["file_level_id"] = file_level_id
+        
+        return cls(**values)
     
     def __repr__(self, include_absolute_path: bool = False):
         formared_lines = f" (Line {self.start_line + 1} to {self.end_line + 1})" if self.start_line and self.end_line else ""
@@ -47,7 +101,8 @@ class Node(BaseModel):
     
     def get_k_first_line(self, k: int = 1) -> str:
         """Get the first line of the code snippet."""
-        lines = self.code_snippet.strip().split('\n')
+        # Split off only the first k lines; the rest of the snippet stays unsplit
+        lines = self.code_snippet.strip().split('\n', k)
         return lines[:k] if lines else ""
 
     
@@ -59,22 +114,32 @@ class Edge(BaseModel):
     object_implementation_file: str
     type: str
 
+    # Runs on the raw input, like Node's validator; as an 'after' validator
+    # stacked under @classmethod it was never registered and so never ran
+    @model_validator(mode='before')
     @classmethod
-    @model_validator(mode='after')
-    def validate_edge(cls, data):
-        data.subject_id = data.subject_id.replace("/", ".")
-        data.object_id = data.object_id.replace("/", ".")
-        parts = data.subject_implementation_file.split(".")
-        if len(parts) > 1:
-            data.subject_implementation_file = "/".join(parts[:-1]) + f".{parts[-1]}"
-        parts = data.object_implementation_file.split(".")
-        if len(parts) > 1:
-            data.object_implementation_file = "/".join(parts[:-1]) + f".{parts[-1]}"
+    def validate_edge(cls, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        
+        data = dict(data)
+        for key in ("subject_id", "object_id"):
+            if isinstance(data.get(key), str):
+                data[key] = normalize_node_id(data[key])
+        for key in ("subject_implementation_file", "object_implementation_file"):
+            if isinstance(data.get(key), str):
+                data[key] = normalize_implementation_file(data[key])
+        
         return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]):
-        return cls(**data)
+        # Ids, paths and types repeat across edges; share one copy of each.
+        # Interning the input avoids pydantic's slow attribute assignment afterwards
+        return cls(**{
+            key: intern(value) if isinstance(value, str) else value
+            for key, value in data.items()
+        })
     
     def __repr__(self):
         return f"Edge: {self.subject_id} --{self.type}--> {self.object_id}"
\ No newline at end of file
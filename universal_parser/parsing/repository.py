@@ -1,17 +1,23 @@
 import asyncio
 import os
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
 import time
 from tqdm import tqdm
 import fnmatch
 import logging
+import re
 
-from .single_file import extract_nodes_and_edges
+from .single_file import extract_nodes_and_edges, get_ast_pool, list_project_files, shutdown_ast_pool
 from ..core.models import Node, Edge
 from .patterns import DEFAULT_IGNORE_PATTERNS, DEFAULT_INCLUDE_PATTERNS
 from .incremental import ChangeDetector, IncrementalAggregator
 from ..utils.logger import logger
+from ..utils.utils import list_tree_files
+
+# Threads listing directories concurrently during file discovery
+DISCOVERY_WORKERS = 8
 
 
 class RepositoryParser:
@@ -21,8 +27,10 @@ class RepositoryParser:
         self.repo_dir = Path(repo_dir).resolve()
         self.repo_name = self.repo_dir.name
         self.supported_files: List[Path] = []
-        self.all_nodes: List[Node] = []
-        self.all_edges: List[Edge] = []
+        # Results across files, keyed by node id and by edge (subject, object, type);
+        # of duplicates, the copy from the earliest file in parse order is kept
+        self.all_nodes: Dict[str, Node] = {}
+        self.all_edges: Dict[Tuple[str, str, str], Edge] = {}
         self.failed_files: List[str] = []
 
         self.output_dir = Path(output_dir) / self.repo_name
@@ -31,47 +39,134 @@ class RepositoryParser:
         self.change_detector = ChangeDetector(str(self.repo_dir), output_dir)
         self.incremental_aggregator = IncrementalAggregator(str(self.repo_dir), output_dir)
         
+        # Patterns are compiled once into combined matchers, so each path is
+        # checked with a few C-level calls instead of a Python loop over patterns
+        self._exclude_glob = self._compile_globs(DEFAULT_IGNORE_PATTERNS)
+        self._include_glob = self._compile_globs(DEFAULT_INCLUDE_PATTERNS)
+        self._include_suffixes = self._glob_suffixes(DEFAULT_INCLUDE_PATTERNS)
+        directory_patterns = [p for p in DEFAULT_IGNORE_PATTERNS if p.endswith("/")]
+        name_patterns = [p for p in DEFAULT_IGNORE_PATTERNS if not p.endswith("/")]
+        self._exclude_prefixes = tuple(
+            [p.rstrip("/") for p in directory_patterns] + [p + "/" for p in name_patterns]
+        )
+        self._exclude_names = frozenset(name_patterns)
+    
+    @staticmethod
+    def _compile_globs(patterns) -> Optional[re.Pattern]:
+        """Compile glob patterns into one regex matching any of them, as fnmatch does."""
+        if not patterns:
+            return None
+        return re.compile("|".join(f"(?:{fnmatch.translate(os.path.normcase(p))})" for p in patterns))
+        
+    @staticmethod
+    def _glob_suffixes(patterns) -> Optional[Tuple[str, ...]]:
+        """
+        Get the suffixes matched by extension-only glob patterns ("*.py").
+        
+        Returns:
+            The suffixes, or None if any pattern is not a plain "*.<ext>" glob
+        """
+        if not patterns or not all(
+            p.startswith("*.") and not any(c in p[1:] for c in "*?[") for p in patterns
+        ):
+            return None
+        return tuple(os.path.normcase(p[1:]) for p in patterns)
+        
     def discover_files(self) -> List[Path]:
         """Discover all supported files in the repository."""
         logger.debug(f"Discovering files in repository: {self.repo_dir}")
         
+        # Directories are listed one level at a time on a thread pool, since
+        # scandir releases the GIL while it waits on the filesystem
+        root = (str(self.repo_dir), "")
+        scanned: Dict[str, Tuple[List[Path], List[Tuple[str, str]], int]] = {}
+        frontier = [root]
+        with ThreadPoolExecutor(max_workers=DISCOVERY_WORKERS) as executor:
+            while frontier:
+                results = list(executor.map(lambda d: self._scan_directory(*d), frontier))
+                next_frontier = []
+                for (directory, _), result in zip(frontier, results):
+                    scanned[directory] = result
+                    next_frontier.extend(result[1])
+                frontier = next_frontier
+        
+        # Assemble the results depth-first, in os.walk's top-down order
         supported_files: List[Path] = []
         total_files = 0
-        
-        for root, dirs, files in os.walk(self.repo_dir):
-            # Skip common directories that shouldn't be parsed
-            # Get relative path from repo root for pattern matching
-            try:
-                relative_root = str(Path(root).relative_to(self.repo_dir))
-            except ValueError:
-                # If relative_to fails, use empty string for repo root
-                relative_root = ""
-            
-            dirs[:] = [d for d in dirs if not d.startswith('.') and not self._should_exclude_path(relative_root, d)]
-            
-            for file in files:
-                total_files += 1
-                file_path = Path(root) / file
-                
-                # Get relative path from repo root for pattern matching
-                try:
-                    relative_path = str(file_path.relative_to(self.repo_dir))
-                except ValueError:
-                    # If relative_to fails, use the current approach
-                    relative_path = root
-                
-                # Check if file should be excluded based on patterns
-                if self._should_exclude_path(relative_path, file):
-                    continue
-                
-                # Check if file should be included based on inclusion patterns
-                if self._should_include_file(relative_path, file):
-                    supported_files.append(file_path)
+        stack = [root[0]]
+        while stack:
+            files, dirs, file_count = scanned[stack.pop()]
+            supported_files.extend(files)
+            total_files += file_count
+            # Reversed so that subdirectories are visited in listing order
+            stack.extend(directory for directory, _ in reversed(dirs))
 
         logger.debug(f"Found {len(supported_files)} supported files out of {total_files} total files")
 
         return supported_files
     
+    def _scan_directory(
+        self,
+        root: str,
+        relative_root: str
+    ) -> Tuple[List[Path], List[Tuple[str, str]], int]:
+        """
+        List one directory, filtering its entries with the exclude and include patterns.
+        
+        DirEntry caches the file type from the directory listing, so entries need
+        no extra stat, and relative paths are built as strings instead of with
+        Path.relative_to.
+        
+        Args:
+            root: Absolute path of the directory
+            relative_root: Path of the directory relative to the repository root
+            
+        Returns:
+            Tuple of (supported files, (absolute, relative) paths of the
+            subdirectories to descend into, number of files seen)
+        """
+        try:
+            with os.scandir(root) as entries:
+                entries = list(entries)
+        except OSError:
+            # Unreadable directories are skipped, as os.walk does
+            return [], [], 0
+        
+        supported_files: List[Path] = []
+        dirs: List[Tuple[str, str]] = []
+        total_files = 0
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            
+            if is_dir:
+                # Skip common directories that shouldn't be parsed; like
+                # os.walk, symlinked directories are not followed
+                if (
+                    not entry.name.startswith('.')
+                    and not self._should_exclude_path(relative_root or ".", entry.name)
+                    and not entry.is_symlink()
+                ):
+                    dirs.append((entry.path, os.path.join(relative_root, entry.name)))
+                continue
+            
+            total_files += 1
+            relative_path = os.path.join(relative_root, entry.name)
+            
+            # Check if file should be included based on inclusion patterns; this
+            # is usually a single suffix check, so it runs first and rejects
+            # most non-source files before the exclude patterns are tried
+            if not self._should_include_file(relative_path, entry.name):
+                continue
+            
+            # Check if file should be excluded based on patterns
+            if not self._should_exclude_path(relative_path, entry.name):
+                supported_files.append(Path(entry.path))
+        
+        return supported_files, dirs, total_files
+    
     def _should_exclude_path(self, path: str, filename: str) -> bool:
         """
         Determine if a path should be excluded based on exclusion patterns.
@@ -86,21 +181,17 @@ class RepositoryParser:
         Returns:
             True if the path should be excluded, False otherwise.
         """
-        for pattern in DEFAULT_IGNORE_PATTERNS:
-            if fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(filename, pattern):
-                return True
-
-            if pattern.endswith("/"):
-                if path.startswith(pattern.rstrip("/")):
-                    return True
-            else:
-                if path.startswith(pattern + "/") or path == pattern:
-                    return True
+        if self._exclude_glob is not None and (
+            self._exclude_glob.match(os.path.normcase(path))
+            or self._exclude_glob.match(os.path.normcase(filename))
+        ):
+            return True
 
-                path_parts = path.split("/")
-                if pattern in path_parts:
-                    return True
-        return False
+        # Directory patterns ("build/") match as plain prefixes, other patterns
+        # as a leading path component, the whole path or any path component
+        if path.startswith(self._exclude_prefixes) or path in self._exclude_names:
+            return True
+        return not self._exclude_names.isdisjoint(path.split("/"))
     
     def _should_include_file(self, path: str, filename: str) -> bool:
         """
@@ -116,13 +207,18 @@ class RepositoryParser:
         Returns:
             True if the file should be included, False otherwise.
         """
-        if not DEFAULT_INCLUDE_PATTERNS:
+        if self._include_glob is None:
             return True
+        
+        # Extension-only patterns match exactly the filenames ending in one of
+        # their suffixes, whichever of path or filename is tested
+        if self._include_suffixes is not None:
+            return os.path.normcase(filename).endswith(self._include_suffixes)
 
-        for pattern in DEFAULT_INCLUDE_PATTERNS:
-            if fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(filename, pattern):
-                return True
-        return False
+        return bool(
+            self._include_glob.match(os.path.normcase(path))
+            or self._include_glob.match(os.path.normcase(filename))
+        )
 
     async def parse_repository_incremental(
         self,
@@ -132,6 +228,10 @@ class RepositoryParser:
         """Parse repository incrementally, only processing changed files."""
         logger.debug(f"Starting incremental repository parsing for: {self.repo_dir}")
         
+        # Files may have changed since a previous run in this process
+        list_project_files.cache_clear()
+        list_tree_files.cache_clear()
+        
         # Load existing metadata
         self.change_detector.load_metadata()
         
@@ -177,7 +277,7 @@ class RepositoryParser:
         
         # Add new data to aggregated results
         aggregated_data = self.incremental_aggregator.add_file_data_to_aggregated(
-            aggregated_data, self.all_nodes, self.all_edges
+            aggregated_data, list(self.all_nodes.values()), list(self.all_edges.values())
         )
         
         # Update statistics
@@ -216,41 +316,70 @@ class RepositoryParser:
         logger.debug(f"Starting to parse {len(files_to_parse)} files with max concurrency: {max_concurrent}")
         start_time = time.time()
         
-        semaphore = asyncio.Semaphore(max_concurrent)
-        
-        async def parse_with_semaphore(file_path):
-            async with semaphore:
-                return await self.parse_single_file_wrapper_incremental(file_path)
-        
-        # Create tasks for all files
-        tasks = [parse_with_semaphore(file_path) for file_path in files_to_parse]
-        
         # Process files and collect results
+        total_files = len(files_to_parse)
         successful_files = 0
         failed_files = 0
+        processed_files = 0
 
-        progress_bar =  tqdm(enumerate(asyncio.as_completed(tasks)), total=len(tasks))\
-                        if logger.level == logging.DEBUG\
-                        else enumerate(asyncio.as_completed(tasks))
+        progress_bar = tqdm(total=total_files) if logger.level == logging.DEBUG else None
+        
+        # Results by position in files_to_parse, merged in that order once every
+        # file is done, so the copy kept of a duplicate node or edge does not
+        # depend on which LLM response happened to come back first
+        file_results: List[Optional[Tuple[Optional[List[Node]], Optional[List[Edge]], str]]] = [None] * total_files
         
-        for i, task in progress_bar:
-            nodes, edges, file_path = await task
+        def record_result(index, nodes, edges, file_path):
+            nonlocal successful_files, failed_files, processed_files
+            processed_files += 1
+            file_results[index] = (nodes, edges, file_path)
             
             if nodes is not None and edges is not None:
-                self.all_nodes.extend(nodes)
-                self.all_edges.extend(edges)
                 successful_files += 1
             else:
-                self.failed_files.append(file_path)
                 failed_files += 1
             
             # Progress reporting
-            if (i + 1) % 10 == 0 or i + 1 == len(tasks):
+            if progress_bar is not None:
+                progress_bar.update(1)
+            if processed_files % 10 == 0 or processed_files == total_files:
                 elapsed_time = time.time() - start_time
-                logger.debug(f"Progress: {i + 1}/{len(tasks)} files processed. "
+                logger.debug(f"Progress: {processed_files}/{total_files} files processed. "
                           f"Success: {successful_files}, Failed: {failed_files}. "
                           f"Elapsed: {elapsed_time:.2f}s")
         
+        # A fixed set of workers share one iterator over the files, each taking
+        # the next file when it finishes one; this bounds concurrency without a
+        # semaphore, and only max_concurrent tasks exist however many files there are
+        pending_files = enumerate(files_to_parse)
+        
+        async def worker():
+            for index, file_path in pending_files:
+                record_result(index, *await self.parse_single_file_wrapper_incremental(file_path))
+        
+        num_workers = max(1, min(max_concurrent, total_files))
+        # Each worker parses at most one AST at a time, so the process pool needs
+        # no more processes than workers; it is released once all files are done.
+        # A single file is parsed on a thread rather than paying for a process start
+        if total_files > 1:
+            get_ast_pool(max_workers=num_workers)
+        try:
+            await asyncio.gather(*(worker() for _ in range(num_workers)))
+        finally:
+            shutdown_ast_pool()
+        
+        for nodes, edges, file_path in file_results:
+            if nodes is not None and edges is not None:
+                for node in nodes:
+                    self.all_nodes.setdefault(node.id, node)
+                for edge in edges:
+                    self.all_edges.setdefault((edge.subject_id, edge.object_id, edge.type), edge)
+            else:
+                self.failed_files.append(file_path)
+        
+        if progress_bar is not None:
+            progress_bar.close()
+        
         total_time = time.time() - start_time
         logger.debug(f"Completed incremental parsing in {total_time:.2f}s. "
                    f"Files: {len(files_to_parse)}, "
@@ -1,15 +1,22 @@
 import argparse
+import ast
 import asyncio
 import os
 import json
-from tree_sitter import Node as TreeSitterNode
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional
+from tree_sitter import Node as TreeSitterNode, Parser
 from tree_sitter_language_pack import get_parser
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, before_sleep_log
 
 from .patterns import CODE_EXTENSIONS
-from ..utils.llm import get_llm_response
+from ..utils.llm import get_llm_response, load_cached_llm_response, save_cached_llm_response
 from ..core.models import Node, Edge
 from ..utils.logger import logger
+from ..utils.json_io import loads_json
 from ..utils.utils import list_files_at_level_minus_one
 
 import traceback
@@ -19,6 +26,13 @@ CHUNKING_THRESHOLD = 1000  # Lines threshold for chunking
 CHUNK_SIZE = 800  # Target lines per chunk
 CHUNK_OVERLAP = 50  # Lines to overlap between chunks for context
 
+# Worker processes for AST parsing and formatting, started by get_ast_pool()
+_ast_pool: Optional[ProcessPoolExecutor] = None
+
+# Tree-sitter parsers by language, so each grammar is loaded once per process
+_parser_cache: dict[str, Parser] = {}
+_parser_lock = threading.Lock()
+
 PROMPT_NORMALIZATION = """
 Extract nodes and edges from the following formated AST and project structure context.
 
@@ -63,40 +77,136 @@ IMPORTANT INSTRUCTIONS:
 - Use the provided project structure to understand the context and relationships between files
 """
 
+# The template split around its two fields once at import, so building a prompt
+# is a plain join instead of re-parsing the template with str.format per file
+_PROMPT_BEFORE_FILE_TREE, _PROMPT_BEFORE_AST, _PROMPT_AFTER_AST = PROMPT_NORMALIZATION.format(
+    file_tree="\0", formatted_ast="\0"
+).split("\0")
+
+
+def build_normalization_prompt(formatted_ast: str, file_tree: str) -> str:
+    """Fill PROMPT_NORMALIZATION, giving the same result as its str.format."""
+    return "".join((_PROMPT_BEFORE_FILE_TREE, file_tree, _PROMPT_BEFORE_AST, formatted_ast, _PROMPT_AFTER_AST))
+
 # ------------------------------------------------------------
 # Format AST
 # ------------------------------------------------------------
 
 def format_ast(node: TreeSitterNode, indent: int = 0) -> str:
-    result = ""
+    # Only top-level nodes (indent 1) are emitted, each with its full source
+    # text, so deeper nodes are never visited and the parts are joined once
     if indent == 0:
-        pass
+        return "".join([format_ast(child, 1) for child in node.children])
     elif indent == 1:
-        result += "\n" + '  ' * (indent-1) + f'Node type: {node.type}' + f"\n---Start Line: {node.start_point[0]}---\n"+node.text.decode("utf-8") + f"\n---End Line: {node.end_point[0]}---\n"
+        return f"\nNode type: {node.type}\n---Start Line: {node.start_point[0]}---\n{node.text.decode('utf-8')}\n---End Line: {node.end_point[0]}---\n"
     else:
         return ""
 
-    for child in node.children:
-        result += format_ast(child, indent + 1)
-
-    return result
-
 # ------------------------------------------------------------
 # Parse AST
 # ------------------------------------------------------------
 
+def get_cached_parser(language: str) -> Parser:
+    """Get the tree-sitter parser for a language, loading its grammar on first use."""
+    parser = _parser_cache.get(language)
+    if parser is None:
+        with _parser_lock:
+            parser = _parser_cache.get(language)
+            if parser is None:
+                parser = _parser_cache[language] = get_parser(language)
+    return parser
+
 def parse_ast(file_path: str) -> str:
+    return parse_ast_and_count_lines(file_path)[0]
+
+def parse_ast_and_count_lines(file_path: str) -> tuple[str, int]:
+    """
+    Parse and format a file's AST, counting its lines from the same read.
+    
+    Returns:
+        Tuple of (formatted AST, number of lines in the file)
+    """
     with open(file_path, "r") as file:
         file_content = file.read()
+    
+    # Same count as iterating the file: a last line without a newline still counts
+    total_lines = file_content.count("\n")
+    if file_content and not file_content.endswith("\n"):
+        total_lines += 1
 
-    extension = "." + file_path.split(".")[-1]
+    extension = os.path.splitext(file_path)[1].lower()
     language = CODE_EXTENSIONS[extension]
 
-    parser = get_parser(language)
+    parser = get_cached_parser(language)
 
     tree = parser.parse(file_content.encode())
 
-    return format_ast(tree.root_node)
+    return format_ast(tree.root_node), total_lines
+
+def get_ast_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Get the shared process pool that AST parsing runs on, starting it if needed.
+    
+    Args:
+        max_workers: Most AST parses that will run at once; the pool never
+            starts more processes than this or the number of CPUs
+    
+    Returns:
+        The shared process pool, to be released with shutdown_ast_pool()
+    """
+    global _ast_pool
+    
+    if _ast_pool is None:
+        workers = os.cpu_count() or 1
+        if max_workers is not None:
+            workers = max(1, min(workers, max_workers))
+        # The pool is started from a process that already runs threads (file
+        # discovery, asyncio.to_thread, the HTTP client), which forking could
+        # deadlock; workers start from a clean process and only need the
+        # module-level parse_ast_and_count_lines
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _ast_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method))
+    return _ast_pool
+
+def shutdown_ast_pool() -> None:
+    """Shut down the shared AST process pool, if it was started."""
+    global _ast_pool
+    
+    if _ast_pool is not None:
+        _ast_pool.shutdown()
+        _ast_pool = None
+
+async def parse_ast_in_pool(file_path: str) -> tuple[str, int]:
+    """
+    Parse and format a file's AST in a worker process.
+    
+    Formatting the AST is pure Python and holds the GIL, so running it in
+    the event loop's process would stall every other file's LLM calls. The
+    file is also read there, so its read never blocks the event loop.
+    When no pool was started, e.g. because a single file is being parsed,
+    it runs on a thread instead of paying for a process start.
+    
+    Returns:
+        Tuple of (formatted AST, number of lines in the file)
+    """
+    if _ast_pool is None:
+        return await asyncio.to_thread(parse_ast_and_count_lines, file_path)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_ast_pool, parse_ast_and_count_lines, file_path)
+
+@lru_cache(maxsize=8)
+def list_project_files(absolute_path_to_project: str) -> tuple[str, ...]:
+    """
+    List the absolute paths of all files in a project, walking it only once.
+    
+    Invalid paths can come from every node and edge the LLM returns, so the
+    walk is cached; RepositoryParser clears the cache at the start of each run.
+    """
+    return tuple(
+        os.path.join(root, file)
+        for root, dirs, files in os.walk(absolute_path_to_project)
+        for file in files
+    )
 
 def recovery_invalid_file_path(absolute_path_to_project: str, file_path: str) -> str:
     """
@@ -109,11 +219,7 @@ def recovery_invalid_file_path(absolute_path_to_project: str, file_path: str) ->
     else:
         logger.debug(f"Found invalid file path: {file_path}")
         # find available file paths matching the file_path in absolute_path_to_project directory, if there is only one, remove absolute_path_to_project and return it
-        available_files = []
-        for root, dirs, files in os.walk(absolute_path_to_project):
-            for file in files:
-                if os.path.join(root, file).endswith(file_path):
-                    available_files.append(os.path.join(root, file))
+        available_files = [path for path in list_project_files(absolute_path_to_project) if path.endswith(file_path)]
 
         if len(available_files) == 1:
             file_path = available_files[0].replace(absolute_path_to_project, "")
@@ -155,7 +261,15 @@ async def parse_llm_response_with_retry(prompt: str, file_path: str, absolute_pa
     logger.debug("##### Prompt #####")
     logger.debug(prompt)
     
-    llm_response = await get_llm_response(prompt)
+    # Only responses that parsed successfully are cached, so a retry after a
+    # bad response always asks the LLM again
+    cached_response = load_cached_llm_response(prompt)
+    if cached_response is not None:
+        logger.debug(f"Using cached LLM response for {file_path}")
+        llm_response = cached_response
+    else:
+        llm_response = await get_llm_response(prompt)
+    raw_llm_response = llm_response
 
     if "</think>" in llm_response:
         llm_response = llm_response.split("</think>")[-1]
@@ -174,16 +288,17 @@ async def parse_llm_response_with_retry(prompt: str, file_path: str, absolute_pa
     
     json_str = llm_response[json_start:json_end]
     
-    # Parse JSON (prefer json.loads over eval for security)
+    # Parse JSON (literal_eval only evaluates literals, unlike eval)
     try:
-        result = json.loads(json_str)
+        result = loads_json(json_str)
     except json.JSONDecodeError:
-        # Fallback to eval if json.loads fails (for malformed JSON)
-        logger.warning(f"JSON parsing failed for {file_path}, trying eval as fallback")
+        # Fallback to literal_eval for Python-style output (single quotes,
+        # trailing commas, comments) that is not valid JSON
+        logger.warning(f"JSON parsing failed for {file_path}, trying literal_eval as fallback")
         try:
-            result = eval(json_str)
+            result = ast.literal_eval(json_str)
         except Exception as eval_error:
-            logger.debug(f"Both JSON parsing and eval failed for {file_path}: {eval_error}")
+            logger.debug(f"Both JSON parsing and literal_eval failed for {file_path}: {eval_error}")
             logger.debug(f"LLM Response that caused the error:\n{llm_response}")
             raise
     
@@ -193,7 +308,29 @@ async def parse_llm_response_with_retry(prompt: str, file_path: str, absolute_pa
         logger.debug(f"LLM Response that caused the error:\n{llm_response}")
         raise KeyError(f"Missing required keys 'nodes' or 'edges' in LLM response for {file_path}")
     
-    # Create Node and Edge objects
+    if cached_response is None:
+        save_cached_llm_response(prompt, raw_llm_response)
+    
+    # Building the results reads source files for snippets and may walk the
+    # project; it runs in one thread dispatch so that I/O never blocks the loop
+    return await asyncio.to_thread(build_nodes_and_edges, result, absolute_path_to_project)
+
+def build_nodes_and_edges(result: dict, absolute_path_to_project: str) -> tuple[list[Node], list[Edge]]:
+    """
+    Build Node and Edge objects from a parsed LLM response.
+    
+    Nodes and edges whose implementation files cannot be found are dropped,
+    and each node gets the code snippet from its file.
+    
+    Args:
+        result: The parsed LLM response, with "nodes" and "edges" lists
+        absolute_path_to_project: Absolute path to the project root
+        
+    Returns:
+        Tuple of (nodes, edges) lists
+    """
+    # Create Node and Edge objects; most nodes share a file, so each file is read once
+    file_lines_cache = {}
     nodes = []
     for node in result["nodes"]:
         try:
@@ -205,7 +342,8 @@ async def parse_llm_response_with_retry(prompt: str, file_path: str, absolute_pa
                     _node.implementation_file, 
                     _node.start_line, 
                     _node.end_line, 
-                    absolute_path_to_project
+                    absolute_path_to_project,
+                    file_lines_cache
                 )
                 nodes.append(_node)
             else:
@@ -233,7 +371,13 @@ async def parse_llm_response_with_retry(prompt: str, file_path: str, absolute_pa
 # Code Snippet Extraction
 # ------------------------------------------------------------
 
-def extract_code_snippet(file_path: str, start_line: int, end_line: int, absolute_path_to_project: str) -> str:
+def extract_code_snippet(
+    file_path: str,
+    start_line: int,
+    end_line: int,
+    absolute_path_to_project: str,
+    file_lines_cache: Optional[dict[str, list[str]]] = None
+) -> str:
     """
     Extract code snippet from a file between start_line and end_line (inclusive).
     
@@ -242,6 +386,8 @@ def extract_code_snippet(file_path: str, start_line: int, end_line: int, absolut
         start_line: Starting line number (1-indexed)
         end_line: Ending line number (1-indexed)
         absolute_path_to_project: Absolute path to the project root
+        file_lines_cache: Optional dict of file lines by absolute path, shared
+            across calls so that each file is read and split only once
         
     Returns:
         The code snippet as a string, or empty string if extraction fails
@@ -250,14 +396,17 @@ def extract_code_snippet(file_path: str, start_line: int, end_line: int, absolut
         # Convert to absolute path
         absolute_file_path = os.path.join(absolute_path_to_project, file_path)
         
-        if not os.path.exists(absolute_file_path):
-            logger.warning(f"File not found for code snippet extraction: {absolute_file_path}")
-            return ""
-        
-        with open(absolute_file_path, 'r', encoding='utf-8') as file:
-            file_content = file.read()
-
-        lines = file_content.split("\n")
+        lines = file_lines_cache.get(absolute_file_path) if file_lines_cache is not None else None
+        if lines is None:
+            # Opening directly reports a missing file without a separate exists() stat
+            try:
+                with open(absolute_file_path, 'r', encoding='utf-8') as file:
+                    lines = file.read().split("\n")
+            except FileNotFoundError:
+                logger.warning(f"File not found for code snippet extraction: {absolute_file_path}")
+                return ""
+            if file_lines_cache is not None:
+                file_lines_cache[absolute_file_path] = lines
         
         # Convert to 0-indexed and ensure valid range
         start_idx = max(0, start_line)
@@ -275,19 +424,6 @@ def extract_code_snippet(file_path: str, start_line: int, end_line: int, absolut
         logger.debug(f"Error extracting code snippet from {file_path} (lines {start_line}-{end_line}): {e}")
         return ""
 
-# ------------------------------------------------------------
-# File Line Counting
-# ------------------------------------------------------------
-
-def count_file_lines(file_path: str) -> int:
-    """Count the number of lines in a file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return sum(1 for _ in file)
-    except Exception as e:
-        logger.warning(f"Error counting lines in {file_path}: {e}")
-        return 0
-
 # ------------------------------------------------------------
 # AST Chunking
 # ------------------------------------------------------------
@@ -371,7 +507,7 @@ async def process_chunk(
 ) -> tuple[list[Node], list[Edge]]:
     """Process a single chunk of formatted AST."""
     try:
-        prompt = PROMPT_NORMALIZATION.format(formatted_ast=chunk, file_tree=file_tree)
+        prompt = build_normalization_prompt(chunk, file_tree)
         
         logger.debug(f"Processing chunk {chunk_index + 1} for {file_path}")
         nodes, edges = await parse_llm_response_with_retry(prompt, f"{file_path}_chunk_{chunk_index}", absolute_path_to_project)
@@ -409,6 +545,37 @@ def deduplicate_results(all_nodes: list[Node], all_edges: list[Edge]) -> tuple[l
     
     return unique_nodes, unique_edges
 
+# ------------------------------------------------------------
+# Result Saving
+# ------------------------------------------------------------
+
+def save_file_results(output_path: str, nodes: list[Node], edges: list[Edge]) -> None:
+    """
+    Write a file's nodes and edges to JSON one record at a time.
+    
+    Records are serialized straight to JSON by pydantic's compiled
+    serializer and written one at a time, so neither an intermediate dict
+    per record nor the full result dict is ever built.
+    
+    Args:
+        output_path: Path of the JSON file to write
+        nodes: Nodes extracted from the file
+        edges: Edges extracted from the file
+    """
+    def write_records(file, records) -> None:
+        file.write("[")
+        for i, record in enumerate(records):
+            file.write(",\n        " if i else "\n        ")
+            file.write(record.model_dump_json())
+        file.write("\n    ]" if records else "]")
+    
+    with open(output_path, "w") as file:
+        file.write('{\n    "nodes": ')
+        write_records(file, nodes)
+        file.write(',\n    "edges": ')
+        write_records(file, edges)
+        file.write("\n}\n")
+
 # ------------------------------------------------------------
 
 async def extract_nodes_and_edges(
@@ -421,7 +588,7 @@ async def extract_nodes_and_edges(
     relative_path = os.path.relpath(file_path, absolute_path_to_project)
 
     try:
-        formatted_ast = parse_ast(file_path)
+        formatted_ast, total_lines = await parse_ast_in_pool(file_path)
     except Exception as e:
         logger.warning(f"Error parsing AST for {file_path}")
         # logger.warning(f"Fallback to using raw file content for {file_path}")
@@ -433,7 +600,6 @@ async def extract_nodes_and_edges(
         logger.debug(f"Successfully parsed AST for {file_path}")
 
     # Determine if chunking is needed
-    total_lines = count_file_lines(file_path)
     if total_lines >= CHUNKING_THRESHOLD:
         logger.debug(f"File {file_path} exceeds chunking threshold ({CHUNKING_THRESHOLD} lines). Chunking AST.")
         file_header = f"File: {relative_path}"
@@ -443,7 +609,7 @@ async def extract_nodes_and_edges(
         all_edges = []
         
         # Process chunks concurrently
-        file_tree = list_files_at_level_minus_one(absolute_path_to_project, relative_path)
+        file_tree = await asyncio.to_thread(list_files_at_level_minus_one, absolute_path_to_project, relative_path)
         tasks = [
             process_chunk(chunk, file_tree, relative_path, absolute_path_to_project, i)
             for i, chunk in enumerate(chunks)
@@ -469,8 +635,7 @@ async def extract_nodes_and_edges(
         os.makedirs(output_dir, exist_ok=True)
         output_path = os.path.join(output_dir, relative_path.split("/")[-1] + ".json")
 
-        with open(output_path, "w") as file:
-            json.dump({"nodes": [node.model_dump() for node in unique_nodes], "edges": [edge.model_dump() for edge in unique_edges]}, file, indent=4)
+        await asyncio.to_thread(save_file_results, output_path, unique_nodes, unique_edges)
 
         logger.debug(f"Successfully extracted nodes and edges for {file_path}. Result saved to {output_path}")
         
@@ -482,7 +647,8 @@ async def extract_nodes_and_edges(
         formatted_ast = f"File: {relative_path}\n" + formatted_ast
         
         # Create prompt
-        prompt = PROMPT_NORMALIZATION.format(formatted_ast=formatted_ast, file_tree=list_files_at_level_minus_one(absolute_path_to_project, relative_path))
+        file_tree = await asyncio.to_thread(list_files_at_level_minus_one, absolute_path_to_project, relative_path)
+        prompt = build_normalization_prompt(formatted_ast, file_tree)
 
         # Try to parse the JSON response with retry mechanism
         try:
@@ -493,8 +659,7 @@ async def extract_nodes_and_edges(
 
             nodes, edges = await parse_llm_response_with_retry(prompt, file_path, absolute_path_to_project)
 
-            with open(output_path, "w") as file:
-                json.dump({"nodes": [node.model_dump() for node in nodes], "edges": [edge.model_dump() for edge in edges]}, file, indent=4)
+            await asyncio.to_thread(save_file_results, output_path, nodes, edges)
 
             logger.debug(f"Successfully extracted nodes and edges for {file_path}. Result saved to {output_path}")
 
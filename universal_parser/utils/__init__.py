@@ -1,9 +1,16 @@
 """Utility functions and configurations."""
 
 from .logger import logger, set_log_level
-from .llm import get_llm_response
 from .utils import list_files_at_level_minus_one
 
+
+def __getattr__(name):
+    # The LLM client pulls in openai and the config; load it only when used
+    if name == "get_llm_response":
+        from .llm import get_llm_response
+        return get_llm_response
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = [
     "logger",
     "set_log_level",
@@ -0,0 +1,149 @@
+import json
+import mmap
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, Union
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "speedups" extra
+    orjson = None
+
+# Files larger than this are memory-mapped rather than read when parsed with
+# orjson, so the parser works from the page cache without a bytes copy
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+
+@contextmanager
+def atomic_write(path: Union[str, Path], mode: str = 'wb') -> Iterator[IO]:
+    """
+    Open a file for writing so that it is replaced atomically once written.
+    
+    Data goes to a temporary file next to path, which is flushed to disk and
+    then renamed over path. A crash mid-write leaves the previous file intact
+    instead of a truncated one.
+    
+    Args:
+        path: Path to the file to write
+        mode: Mode to open the temporary file with ('wb' or 'w')
+    
+    Yields:
+        The open temporary file
+    """
+    tmp_path = f"{os.fspath(path)}.tmp"
+    try:
+        with open(tmp_path, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def load_json(path: Union[str, Path]) -> Any:
+    """
+    Load a JSON file, parsing it with orjson when it is installed.
+
+    The file is read in a single call and parsed from bytes; with orjson,
+    files over MMAP_THRESHOLD are parsed straight from a memory map instead.
+    Invalid JSON raises json.JSONDecodeError either way, since orjson's
+    error subclasses it.
+
+    Args:
+        path: Path to the JSON file
+
+    Returns:
+        The parsed JSON value
+    """
+    with open(path, 'rb') as f:
+        if orjson is not None and os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    return orjson.loads(view)
+        content = f.read()
+
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def loads_json(content: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document held in memory, with orjson when it is installed.
+    
+    Args:
+        content: The JSON text
+    
+    Returns:
+        The parsed JSON value
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def dump_json(data: Any, path: Union[str, Path], pretty: bool = False) -> None:
+    """
+    Write a value to a JSON file, using orjson when it is installed.
+    
+    The file is replaced atomically, see atomic_write. orjson writes non-ASCII
+    characters as UTF-8 rather than escaping them; both forms load back to
+    the same value.
+    
+    Args:
+        data: The JSON-serializable value to write
+        path: Path to the JSON file
+        pretty: Whether to indent with 2 spaces for reading by hand; the
+            default compact form is smaller and faster to write
+    """
+    if orjson is not None:
+        with atomic_write(path) as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else None))
+        return
+    
+    with atomic_write(path, 'w') as f:
+        if pretty:
+            json.dump(data, f, indent=2)
+        else:
+            json.dump(data, f, separators=(',', ':'))
+
+
+def _dumps(value: Any) -> bytes:
+    """Serialize a value to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value).encode()
+
+
+def dump_json_records(data: Dict[str, Any], path: Union[str, Path]) -> None:
+    """
+    Write a JSON object to a file, streaming its list values one element at a time.
+    
+    Each element of a list value is serialized and written on its own line,
+    so the whole document is never held in memory as one string. Other
+    values are written compactly after their key. The file is replaced
+    atomically, see atomic_write.
+    
+    Args:
+        data: The JSON object to write
+        path: Path to the JSON file
+    """
+    with atomic_write(path) as f:
+        f.write(b"{")
+        for i, (key, value) in enumerate(data.items()):
+            f.write(b",\n  " if i else b"\n  ")
+            f.write(_dumps(key))
+            f.write(b": ")
+            if isinstance(value, list):
+                f.write(b"[")
+                for j, record in enumerate(value):
+                    f.write(b",\n    " if j else b"\n    ")
+                    f.write(_dumps(record))
+                f.write(b"\n  ]" if value else b"]")
+            else:
+                f.write(_dumps(value))
+        f.write(b"\n}\n" if data else b"}\n")
@@ -1,22 +1,120 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from typing import Any, Optional, Tuple
+
 from openai import AsyncOpenAI
-from ..core.config import LLM_MODEL, LLM_BASE_URL, LLM_API_KEY
+from ..core import config
+
+# One client is shared across calls so its HTTP connection pool (and TLS sessions)
+# are reused; it is rebuilt when the config or the running event loop changes
+_client: Optional[AsyncOpenAI] = None
+_client_key: Optional[Tuple[Any, ...]] = None
+
+# Sampling parameters for every request; they are part of the response cache key
+LLM_TEMPERATURE = 0.1
+LLM_MAX_TOKENS = 16000
+
+
+def get_llm_client() -> AsyncOpenAI:
+    """Get the shared LLM client for the current configuration and event loop."""
+    global _client, _client_key
+
+    key = (config.LLM_API_KEY, config.LLM_BASE_URL, asyncio.get_running_loop())
+    if _client is None or key != _client_key:
+        _client = AsyncOpenAI(
+            api_key=config.LLM_API_KEY,
+            base_url=config.LLM_BASE_URL,
+        )
+        _client_key = key
+    return _client
 
 
 async def get_llm_response(prompt: str) -> str:
     """Get response from LLM service."""
-    if not LLM_API_KEY:
+    if not config.LLM_API_KEY:
         raise ValueError("LLM_API_KEY is not set. Please set it in environment variables or .env file")
-    
-    client = AsyncOpenAI(
-        api_key=LLM_API_KEY,
-        base_url=LLM_BASE_URL,
-    )
+
+    client = get_llm_client()
 
     response = await client.chat.completions.create(
-        model=LLM_MODEL,
+        model=config.LLM_MODEL,
         messages=[{"role": "user", "content": prompt}],
-        temperature=0.1,
-        max_tokens=16000
+        temperature=LLM_TEMPERATURE,
+        max_tokens=LLM_MAX_TOKENS
     )
 
-    return response.choices[0].message.content.strip() 
\ No newline at end of file
+    return response.choices[0].message.content.strip()
+
+
+def get_llm_cache_path(prompt: str) -> Optional[str]:
+    """
+    Get the cache file for a prompt's response, or None if caching is disabled.
+    
+    The key covers everything that shapes the response besides the prompt:
+    the endpoint, the model and the sampling parameters. Two endpoints serving
+    the same model name therefore never share cached responses.
+    """
+    if not config.LLM_CACHE_DIR:
+        return None
+    
+    key = hashlib.blake2b(
+        "\0".join((
+            config.LLM_BASE_URL, config.LLM_MODEL, str(LLM_TEMPERATURE), str(LLM_MAX_TOKENS), prompt
+        )).encode(),
+        digest_size=16
+    ).hexdigest()
+    return os.path.join(config.LLM_CACHE_DIR, key[:2], f"{key}.txt")
+
+
+def load_cached_llm_response(prompt: str) -> Optional[str]:
+    """
+    Load the cached LLM response for a prompt.
+    
+    Args:
+        prompt: The prompt sent to the LLM
+        
+    Returns:
+        The cached response, or None if there is none
+    """
+    cache_path = get_llm_cache_path(prompt)
+    if cache_path is None:
+        return None
+    
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def save_cached_llm_response(prompt: str, response: str) -> None:
+    """
+    Cache the LLM response for a prompt, so the same prompt is not sent again.
+    
+    The file is written under a temporary name and then renamed, so a reader
+    never sees a partially written response.
+    
+    Args:
+        prompt: The prompt sent to the LLM
+        response: The LLM response to cache
+    """
+    cache_path = get_llm_cache_path(prompt)
+    if cache_path is None:
+        return
+    
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(response)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        # The cache is only an optimization; a failed write just means a miss next time
+        pass
@@ -1,5 +1,9 @@
+import fnmatch
+import os
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Set
+from typing import Callable, Optional, Set
 
 # Common folders and files to ignore
 IGNORE_PATTERNS = {
@@ -27,6 +31,90 @@ IGNORE_PATTERNS = {
     '.npm', '.yarn', '.pnpm-store'
 }
 
+@lru_cache(maxsize=1024)
+def compile_glob(pattern: str) -> Callable[[str], Optional[re.Match]]:
+    """Compile a glob pattern once into a match function that behaves like fnmatch.fnmatch."""
+    return re.compile(fnmatch.translate(os.path.normcase(pattern))).match
+
+@lru_cache(maxsize=512)
+def list_tree_files(directory: str, rel_directory: str, max_depth: int,
+                    include_directories: bool, ignore_patterns: frozenset) -> tuple:
+    """
+    Lists the sorted relative paths of the files under a level-1 directory, up to max_depth.
+    
+    Every file in the same directory shares this listing, so it is cached and
+    the tree is scanned once per directory rather than once per file. Call
+    list_tree_files.cache_clear() when the tree may have changed.
+    
+    Args:
+        directory (str): Absolute path to the level-1 directory
+        rel_directory (str): Path of that directory relative to the project root ("" for the root)
+        max_depth (int): Maximum depth to traverse from the level-1 directory
+        include_directories (bool): Whether to include directories at the last level
+        ignore_patterns (frozenset): Folder/file patterns to ignore
+    
+    Returns:
+        tuple: Sorted relative paths (from project root) of the files/directories found
+    """
+    wildcard_matchers = [compile_glob(pattern) for pattern in ignore_patterns if '*' in pattern]
+    
+    def should_ignore(path_name: str) -> bool:
+        """Check if a file or directory name should be ignored based on ignore patterns"""
+        # Check exact name matches
+        if path_name in ignore_patterns:
+            return True
+        
+        # Check for patterns with wildcards
+        normalized_name = os.path.normcase(path_name)
+        for match in wildcard_matchers:
+            if match(normalized_name):
+                return True
+        
+        # Check for hidden files/directories (starting with .)
+        if path_name.startswith('.') and path_name not in {'.', '..'}:
+            return True
+            
+        return False
+    
+    def scan_directory(directory: str, rel_directory: str, current_files: Set[str], current_depth: int):
+        """
+        Add the files in a directory, and recurse into its subdirectories up to max_depth.
+        
+        scandir reports each entry's type from the directory listing, so files
+        and directories are told apart without a stat call per entry, and
+        relative paths are built by joining names instead of Path.relative_to.
+        """
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    # Skip ignored items
+                    if should_ignore(entry.name):
+                        continue
+                    
+                    rel_path = os.path.join(rel_directory, entry.name)
+                    
+                    if entry.is_file():
+                        current_files.add(rel_path)
+                    elif entry.is_dir():
+                        # Add directory if requested (level-1 directories themselves are not listed)
+                        if include_directories and current_depth and current_depth == max_depth - 1:
+                            current_files.add(rel_path + '/...')
+                        # Recursively process subdirectory
+                        if current_depth + 1 < max_depth:
+                            scan_directory(entry.path, rel_path, current_files, current_depth + 1)
+        except OSError:
+            # Skip directories we can't read, or that disappeared while scanning
+            pass
+    
+    # Set to avoid duplicates
+    all_files = set()
+    
+    # Direct files of the level-1 directory are added at any depth and its
+    # subdirectories are walked from depth 1
+    scan_directory(directory, rel_directory, all_files, 0)
+    
+    return tuple(sorted(all_files))
+
 def list_files_at_level_minus_one(proj_path: str, file_path: str, max_depth: int = 3, 
                                  include_directories: bool = True, 
                                  ignore_patterns: Set[str] = None) -> str:
@@ -51,27 +139,6 @@ def list_files_at_level_minus_one(proj_path: str, file_path: str, max_depth: int
     if ignore_patterns is None:
         ignore_patterns = IGNORE_PATTERNS
     
-    def should_ignore(path: Path) -> bool:
-        """Check if a path should be ignored based on ignore patterns"""
-        path_name = path.name
-        
-        # Check exact name matches
-        if path_name in ignore_patterns:
-            return True
-        
-        # Check for patterns with wildcards
-        for pattern in ignore_patterns:
-            if '*' in pattern:
-                import fnmatch
-                if fnmatch.fnmatch(path_name, pattern):
-                    return True
-        
-        # Check for hidden files/directories (starting with .)
-        if path_name.startswith('.') and path_name not in {'.', '..'}:
-            return True
-            
-        return False
-    
     # Validate inputs
     if not proj_root.exists():
         raise ValueError(f"Project root does not exist: {proj_path}")
@@ -89,61 +156,14 @@ def list_files_at_level_minus_one(proj_path: str, file_path: str, max_depth: int
     if parent_dir == proj_root.parent:
         parent_dir = proj_root
     
-    result_files = []
-    
-    def add_files_recursively(directory: Path, current_files: Set[str], current_depth: int = 0):
-        """Recursively add all files and directories from a directory up to max_depth"""
-        if not directory.exists() or not directory.is_dir() or current_depth >= max_depth:
-            return
-        
-        try:
-            for item in directory.iterdir():
-                # Skip ignored items
-                if should_ignore(item):
-                    continue
-                
-                rel_path = item.relative_to(proj_root)
-                
-                if item.is_file():
-                    current_files.add(str(rel_path))
-                elif item.is_dir():
-                    # Add directory if requested
-                    if include_directories and current_depth == max_depth - 1:
-                        current_files.add(str(rel_path) + '/...') 
-                    # Recursively process subdirectory
-                    add_files_recursively(item, current_files, current_depth + 1)
-        except PermissionError:
-            # Skip directories we don't have permission to read
-            pass
-    
-    # Set to avoid duplicates
-    all_files = set()
-    
-    # Process all items in the parent directory (level-1)
-    if parent_dir.exists():
-        try:
-            for item in parent_dir.iterdir():
-                # Skip ignored items
-                if should_ignore(item):
-                    continue
-                
-                rel_path = item.relative_to(proj_root)
-                
-                if item.is_file():
-                    # Add file at level-1
-                    all_files.add(str(rel_path))
-                elif item.is_dir():
-                    # Add directory at level-1 if requested
-                    # if include_directories:
-                    #     all_files.add(str(rel_path) + '/')
-                    # Add all files in subdirectories (children) up to max_depth
-                    add_files_recursively(item, all_files, 1)
-        except PermissionError:
-            # Skip if we don't have permission to read the parent directory
-            pass
-    
-    # Convert to sorted list
-    result_files = sorted(list(all_files))
+    rel_parent_dir = str(parent_dir.relative_to(proj_root))
+    result_files = list_tree_files(
+        str(parent_dir),
+        "" if rel_parent_dir == "." else rel_parent_dir,
+        max_depth,
+        include_directories,
+        frozenset(ignore_patterns)
+    )
 
     # format the result_files to a string
     result_files_str = "\n  ".join(result_files)